@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import argparse
+import os
+import random
+import openpyxl
+
+VENDORS = ['Microsoft', 'Google', 'Oracle', 'Apache Software Foundation', 'Mozilla', 'Adobe', 'Cisco Systems', 'IBM', 'Red Hat', 'Canonical', 'Linux', 'PostgreSQL Global Development Group', 'Node.js Foundation', 'VMware', 'Fortinet', 'Jenkins', 'Atlassian', 'SAP', 'Juniper Networks', 'Siemens', 'Huawei', 'Apple', 'Citrix', 'Zyxel', 'Яндекс', 'Лаборатория Касперского', '1С', 'Positive Technologies', 'Базальт СПО', 'Астра']
+PRODUCTS = ['Windows 10', 'Windows Server 2019', 'Chrome', 'Chromium', 'Database Server', 'MySQL', 'Java SE', 'Tomcat', 'HTTP Server', 'Firefox', 'Thunderbird', 'Acrobat Reader', 'IOS XE', 'WebSphere Application Server', 'Enterprise Linux', 'Ubuntu', 'Kernel', 'PostgreSQL', 'Node.js', 'ESXi', 'FortiOS', 'Jenkins', 'Confluence', 'Jira Software', 'NetWeaver', 'Junos OS', 'SIMATIC', 'macOS', 'Safari', 'NetScaler ADC', 'Браузер', 'Антивирус', 'Предприятие', 'Office', 'Exchange Server', 'Edge', 'Struts', 'Log4j', 'OpenSSL', 'OpenSSH', 'Nginx', 'Kubernetes', 'Docker Engine', 'Альт Рабочая станция', 'Astra Linux Special Edition']
+SOURCES = ['NVD', 'БДУ ФСТЭК', 'Vendor Advisory']
+LOCAL_COLUMNS = (14, 16, 19)
+GENERAL_COLUMNS = (12, 14, 17)
+
+def random_word(rng):
+    return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(3, 10)))
+
+def misspell(rng, value):
+    if len(value) < 5 or rng.random() > 0.1: return value
+    pos = rng.randint(1, len(value) - 2)
+    return value[:pos] + value[pos + 1] + value[pos] + value[pos + 2:]
+
+def random_version(rng): return f"{rng.randint(1, 20)}.{rng.randint(0, 9)}" + (f".{rng.randint(0, 30)}" if rng.random() < 0.5 else '')
+
+def generate_ppts(path, rows, columns, rng, id_prefix):
+    workbook = openpyxl.Workbook(write_only=True); sheet = workbook.create_sheet(); width = max(columns) + 1
+    for i in range(rows):
+        row = [None] * width
+        vendor = rng.choice(VENDORS) if rng.random() < 0.85 else (random_word(rng).title() if rng.random() < 0.8 else None)
+        product = rng.choice(PRODUCTS) if rng.random() < 0.7 else ' '.join(random_word(rng) for _ in range(rng.randint(1, 3)))
+        if rng.random() < 0.3: product += ' ' + random_version(rng)
+        if rng.random() < 0.03: product = None
+        row[columns[0]] = f"{id_prefix}-{i:06d}"; row[columns[1]] = product; row[columns[2]] = vendor
+        sheet.append(row)
+    workbook.save(path)
+
+def generate_vulnerabilities(path, rows, rng):
+    workbook = openpyxl.Workbook(write_only=True); sheet = workbook.create_sheet(); sheet.append(['№', 'CVE', 'CVSS', 'Продукт', 'Источник'])
+    for i in range(rows):
+        kind = rng.random(); vendor, product = misspell(rng, rng.choice(VENDORS)), misspell(rng, rng.choice(PRODUCTS))
+        if kind < 0.45: product_string = f"{vendor}, {product} {random_version(rng)}"
+        elif kind < 0.65: product_string = f"{vendor} - {product}"
+        elif kind < 0.8: product_string = product
+        elif kind < 0.95: product_string = f"{random_word(rng)} {random_word(rng)}, {random_word(rng)}"
+        else: product_string = None
+        sheet.append([i + 1, f"CVE-{rng.randint(2015, 2025)}-{rng.randint(1000, 99999)}", round(rng.uniform(1, 10), 1), product_string, rng.choice(SOURCES)])
+    workbook.save(path)
+
+def generate_dataset(out_dir, vulnerabilities, ppts_local, ppts_general, seed=1):
+    os.makedirs(out_dir, exist_ok=True); rng = random.Random(seed)
+    paths = {'file_ppts_local': os.path.join(out_dir, 'ppts_local.xlsx'), 'file_ppts_general': os.path.join(out_dir, 'ppts_general.xlsx'), 'file_vulnerabilities': os.path.join(out_dir, 'vulnerabilities.xlsx')}
+    generate_ppts(paths['file_ppts_local'], ppts_local, LOCAL_COLUMNS, rng, 'LOC'); generate_ppts(paths['file_ppts_general'], ppts_general, GENERAL_COLUMNS, rng, 'GEN')
+    generate_vulnerabilities(paths['file_vulnerabilities'], vulnerabilities, rng)
+    return paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Генерация синтетических ППТС и списка уязвимостей для бенчмарков.")
+    parser.add_argument('out_dir', help="каталог для xlsx")
+    parser.add_argument('--vulns', type=int, default=1000, help="строк в списке уязвимостей"); parser.add_argument('--ppts-local', type=int, default=5000, help="строк в локальном ППТС"); parser.add_argument('--ppts-general', type=int, default=20000, help="строк в общем ППТС")
+    parser.add_argument('--seed', type=int, default=1, help="зерно генератора (одинаковое зерно - одинаковые файлы)")
+    args = parser.parse_args(argv)
+    for key, path in generate_dataset(args.out_dir, args.vulns, args.ppts_local, args.ppts_general, args.seed).items(): print(f"{key}: {path}")
+    print(f"Колонки ППТС: локальный {', '.join(map(str, LOCAL_COLUMNS))}, общий {', '.join(map(str, GENERAL_COLUMNS))}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import status_engine as se
+from generate_data import GENERAL_COLUMNS, LOCAL_COLUMNS, PRODUCTS, VENDORS, generate_dataset
+
+PRESETS = {'small': (300, 1000, 4000), 'medium': (2000, 5000, 20000), 'large': (10000, 20000, 80000)}
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config_for_status.txt')
+CALIBRATION_RUNS = 5
+MIN_COMPARABLE_SECONDS = 0.02
+ANALYZE_DATA_RUNS = 3
+DEFAULT_SETTINGS = {'min_word_length': '3', 'min_ratio_score': '60', 'ratio_threshold_2': '85', 'min_output_index': '1', 'word_match_count_threshold': '60', 'min_word_count_for_output': '1', 'match_engine': 'python', 'max_matches_per_vuln': '0'}
+
+class QuietProgress:
+    def update_status(self, message): pass
+    def update_progress(self, done, total): pass
+    def is_cancelled(self): return False
+
+def calibration_workload():
+    words = [f"word{i % 997}" for i in range(200000)]; counts = {}
+    for w in words: counts[w] = counts.get(w, 0) + 1
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+def calibrate_once():
+    gc_was_enabled = gc.isenabled(); gc.disable()
+    try:
+        times = []
+        for _ in range(3):
+            start = time.perf_counter(); calibration_workload(); times.append(time.perf_counter() - start)
+        return min(times)
+    finally:
+        if gc_was_enabled: gc.enable()
+
+def measure(func, repeat):
+    times, calibration = [], []
+    for _ in range(repeat):
+        calibration.append(calibrate_once()); start = time.perf_counter(); func(); times.append(time.perf_counter() - start)
+    ratios = [t / c for t, c in zip(times, calibration)]; median_ratio = statistics.median(ratios)
+    return statistics.median(times), statistics.median(calibration), (max(ratios) - min(ratios)) / median_ratio
+
+def build_config_data(paths, settings, output_dir):
+    status_config = se.read_status_config(CONFIG_PATH); config_data = dict(paths, **settings)
+    config_data.update({'ppts_local_columns': ', '.join(map(str, LOCAL_COLUMNS)), 'ppts_general_columns': ', '.join(map(str, GENERAL_COLUMNS)), 'output_file_path': os.path.join(output_dir, 'report.xlsx'), 'worker_count': '1', 'use_ppts_cache': '0'})
+    config_data.update({k: status_config[k] for k in ['known_status', 'known_da', 'known_linux']})
+    config_data['known_da'] += ''.join(f"\n{vendor.lower()}, {product.lower()} = DA-{i}" for i, (vendor, product) in enumerate(zip(VENDORS[::3], PRODUCTS[::2])))
+    config_data['known_status'] += ''.join(f"\n{product.lower()} = УСЛОВНО, ST-{i}" for i, product in enumerate(PRODUCTS[1::4]))
+    return config_data
+
+def check_engines_agree(products, engine_matches):
+    fields = ('id', 'index', 'vendor_score', 'product_score', 'matched_word_count')
+    reference, *others = se.MATCH_ENGINES; mismatches = []
+    for engine in others:
+        for product, expected, actual in zip(products, engine_matches[reference], engine_matches[engine]):
+            if [tuple(m[f] for f in fields) for m in expected] != [tuple(m[f] for f in fields) for m in actual]: mismatches.append((engine, product))
+    for engine, product in mismatches[:5]: print(f"  Расхождение движков {reference}/{engine}: «{product}»")
+    if mismatches: raise RuntimeError(f"движки сопоставления дали разные результаты для {len(mismatches)} продуктов")
+
+def run_suite(paths, settings, repeat, output_dir):
+    config_data = build_config_data(paths, settings, output_dir); match_settings = se.get_match_settings(config_data); se.apply_match_settings(match_settings)
+    cols_l, cols_g = list(LOCAL_COLUMNS), list(GENERAL_COLUMNS); results = {}; benchmarks = {}
+    def timed(name, func, runs=repeat):
+        benchmarks[name] = (func, runs); results[name], results[f'calibration/{name}'], results[f'spread/{name}'] = measure(func, runs)
+        print(f"  {name:<40} {results[name]:9.4f} с  (медиана {runs}, разброс {results[f'spread/{name}']:.0%})", flush=True)
+    calibration = [calibrate_once() for _ in range(CALIBRATION_RUNS)]
+    products = [row[3] for row in se.iter_vulnerability_rows(paths['file_vulnerabilities'])]
+    timed('load_and_preprocess_ppts_data', lambda: se.load_and_preprocess_ppts_data(paths['file_ppts_local'], paths['file_ppts_general'], cols_l, cols_g))
+    df_ppts = se.load_and_preprocess_ppts_data(paths['file_ppts_local'], paths['file_ppts_general'], cols_l, cols_g)
+    timed('PptsIndex', lambda: se.PptsIndex(df_ppts)); ppts_index = se.PptsIndex(df_ppts)
+    word_sets = [se.normalize_string_words(p) for p in products]; ppts_word_sets = ppts_index.product_words[:200]
+    def word_match_stats():
+        se.get_word_pair_score.cache_clear()
+        for src_words in word_sets:
+            for ppts_words in ppts_word_sets: se.get_word_match_stats(src_words, ppts_words)
+    timed('get_word_match_stats', word_match_stats)
+    da_mapping, linux_mapping, status_mapping = se.parse_rule_mappings(config_data)
+    timed('get_status_from_config', lambda: [se.get_status_from_config(p, da_mapping, linux_mapping, status_mapping) for p in products])
+    rule_matcher = se.KeyPhraseMatcher(da_mapping, linux_mapping, status_mapping)
+    timed('KeyPhraseMatcher.get_status', lambda: [rule_matcher.get_status(p) for p in products])
+    engine_matches = {}
+    for engine in se.MATCH_ENGINES:
+        def find_matches(engine=engine):
+            se.apply_match_settings(dict(match_settings, match_engine=engine))
+            engine_matches[engine] = [se.find_new_strict_matches(p, ppts_index) for p in products]
+            se.apply_match_settings(match_settings)
+        timed(f'find_new_strict_matches[{engine}]', find_matches)
+    check_engines_agree(products, engine_matches); last_run = {}
+    def run_analyze_data():
+        profiler = se.StageProfiler()
+        if not se.analyze_data(QuietProgress(), config_data, profiler): raise RuntimeError("analyze_data завершился с ошибкой")
+        last_run['profiler'] = profiler
+    timed('analyze_data', run_analyze_data, ANALYZE_DATA_RUNS)
+    for stage, seconds in last_run['profiler'].snapshot().items(): results[f'analyze_data/{stage}'] = seconds
+    calibration += [calibrate_once() for _ in range(CALIBRATION_RUNS)]; results['calibration'] = statistics.median(calibration)
+    print(f"  {'calibration':<40} {results['calibration']:9.4f} с  (медиана {len(calibration)} замеров до и после, разброс {min(calibration):.4f}-{max(calibration):.4f} с)")
+    def retime(name):
+        func, runs = benchmarks[name]; return measure(func, runs)
+    return results, dict(last_run['profiler'].counter_values()), retime
+
+def check_regressions(results, baseline, tolerance, retime):
+    regressions = []; speed = results['calibration'] / baseline['calibration']
+    print(f"  Калибровка: машина сейчас x{speed:.2f} относительно базы; каждый тест нормируется калибровкой, чередуемой с его повторами")
+    def normalized_ratio(name, seconds, calibration):
+        base_calibration = baseline.get(f'calibration/{name}')
+        return seconds / baseline[name] / (calibration / base_calibration if base_calibration and calibration else speed)
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if not base or '/' in name or name == 'calibration': continue
+        allowed = max(tolerance, baseline.get(f'spread/{name}', 0.0), results.get(f'spread/{name}', 0.0))
+        ratio = normalized_ratio(name, seconds, results.get(f'calibration/{name}')); mark = 'РЕГРЕССИЯ' if ratio > 1 + allowed else ('быстрее' if ratio < 1 - allowed else 'норма')
+        if max(base, base * ratio) < MIN_COMPARABLE_SECONDS: mark = 'слишком быстро для оценки'
+        if mark == 'РЕГРЕССИЯ':
+            seconds_again, calibration_again, _ = retime(name); ratio_again = normalized_ratio(name, seconds_again, calibration_again)
+            if ratio_again > 1 + allowed: mark = f'РЕГРЕССИЯ (повтор x{ratio_again:.2f})'; regressions.append(name)
+            else: mark = f'шум: повтор x{ratio_again:.2f}'
+        print(f"  {name:<40} {base:9.4f} -> {seconds:9.4f} с  x{ratio:.2f} (норм., допуск {allowed:.0%})  {mark}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки сопоставления и формирования отчета на синтетических данных.")
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small', help="размер данных: уязвимостей / строк локального / общего ППТС")
+    parser.add_argument('--set', dest='overrides', action='append', default=[], metavar='КЛЮЧ=ЗНАЧЕНИЕ', help="переопределить порог или движок, например min_output_index=0")
+    parser.add_argument('--repeat', type=int, default=5, help=f"повторов каждого теста, берется медиана (analyze_data - {ANALYZE_DATA_RUNS})")
+    parser.add_argument('--seed', type=int, default=1); parser.add_argument('--data-dir', help="сохранить сгенерированные данные и отчет в каталог")
+    parser.add_argument('--save-baseline', action='store_true', help="записать результаты как базовые в baselines.json")
+    parser.add_argument('--tolerance', type=float, default=0.25, help=f"допустимое замедление относительно базы (0.25 = 25%%); допуск теста расширяется до разброса его повторов; замеры короче {MIN_COMPARABLE_SECONDS * 1000:.0f} мс только выводятся")
+    parser.add_argument('--fail-on-regression', action='store_true', help="вернуть код 1 при подтвержденной повтором регрессии (по умолчанию только отчет)")
+    args = parser.parse_args(argv)
+    settings = dict(DEFAULT_SETTINGS)
+    for item in args.overrides:
+        key, _, value = item.partition('=')
+        if key not in settings: parser.error(f"неизвестный параметр {key}, доступны: {', '.join(settings)}")
+        settings[key] = value
+    baseline_key = ' '.join([args.preset] + sorted(args.overrides)); vulns, ppts_local, ppts_general = PRESETS[args.preset]
+    baselines = {}
+    if os.path.exists(BASELINES_PATH):
+        with open(BASELINES_PATH, 'r', encoding='utf-8') as f: baselines = json.load(f)
+    machine = f"{platform.system()} {platform.machine()}, Python {platform.python_version()}, {os.cpu_count()} CPU"
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or tmp_dir
+        print(f"Генерация данных ({baseline_key}): уязвимостей {vulns}, ППТС {ppts_local} + {ppts_general}, зерно {args.seed}")
+        paths = generate_dataset(data_dir, vulns, ppts_local, ppts_general, args.seed)
+        results, counters, retime = run_suite(paths, settings, args.repeat, data_dir)
+        if args.save_baseline:
+            baselines[baseline_key] = {'machine': machine, 'seed': args.seed, 'results': {k: round(v, 6) for k, v in results.items()}, 'counters': counters}
+            with open(BASELINES_PATH, 'w', encoding='utf-8') as f: json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True); f.write('\n')
+            print(f"База сохранена: {BASELINES_PATH} [{baseline_key}]"); return 0
+        baseline = baselines.get(baseline_key)
+        if baseline is None: print(f"Базы для [{baseline_key}] нет, запустите с --save-baseline"); return 0
+        print(f"Сравнение с базой [{baseline_key}] ({baseline['machine']}):")
+        if baseline['machine'] != machine: print(f"  Внимание: база снята на другой машине, текущая - {machine}")
+        regressions = check_regressions(results, baseline['results'], args.tolerance, retime)
+    for label, value in counters.items():
+        if baseline['counters'].get(label) != value: print(f"  Внимание: счетчик «{label}» изменился: {baseline['counters'].get(label)} -> {value} (изменилось поведение сопоставления)")
+    if not regressions: print("Регрессий нет."); return 0
+    print(f"Регрессии, подтвержденные повтором: {', '.join(regressions)}")
+    if args.fail_on_regression: return 1
+    print("Режим отчета: код возврата 0 (для проверки в CI добавьте --fail-on-regression)"); return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import argparse
+import configparser
+import sys
+import time
+import multiprocessing
+from status_engine import INT_CONFIG_KEYS, STATUS_CONFIG_SETTINGS, MATCH_ENGINES, analyze_data, format_progress, read_status_config, validate_config_data
+
+DEFAULT_CONFIG = {'ppts_local_columns': '14, 16, 19', 'ppts_general_columns': '12, 14, 17', 'min_word_length': '3', 'min_ratio_score': '60', 'ratio_threshold_2': '85', 'min_output_index': '1', 'word_match_count_threshold': '60', 'min_word_count_for_output': '1', 'worker_count': '1', 'match_engine': 'python', 'use_ppts_cache': '1', 'max_matches_per_vuln': '0', 'incremental': '0', 'profile_sheet': '0'}
+
+class ConsoleProgress:
+    def __init__(self, stream=None, interval=1.0):
+        self.stream = stream if stream is not None else sys.stderr; self.interval = interval; self.last_time = 0.0; self.start_time = None
+    def update_status(self, message):
+        now = time.monotonic()
+        if now - self.last_time >= self.interval: self.stream.write(message + "\n"); self.stream.flush(); self.last_time = now
+    def update_progress(self, done, total):
+        now = time.monotonic()
+        if self.start_time is None or done == 0: self.start_time = now
+        self.update_status(format_progress(done, total, now - self.start_time))
+    def is_cancelled(self): return False
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Анализ статусов уязвимостей без графического интерфейса (пакетный режим).")
+    files = parser.add_argument_group("файлы")
+    files.add_argument('-v', '--vulnerabilities', dest='file_vulnerabilities', required=True, metavar='XLSX', help="xlsx со списком уязвимостей (№, CVE, CVSS, Продукт, Источник)")
+    files.add_argument('-l', '--ppts-local', dest='file_ppts_local', required=True, metavar='XLSX', help="xlsx локального ППТС")
+    files.add_argument('-g', '--ppts-general', dest='file_ppts_general', required=True, metavar='XLSX', help="xlsx общего ППТС")
+    files.add_argument('-c', '--status-config', dest='status_config_file', metavar='TXT', help="файл конфигурации статусов ([KnownSTATUS], [KnownDA], [KnownLINUX], [Settings])")
+    files.add_argument('-o', '--output', dest='output_file_path', required=True, metavar='XLSX', help="путь отчета; к имени добавляется метка времени")
+    settings = parser.add_argument_group("настройки (по умолчанию - как в GUI или из [Settings] конфига)")
+    settings.add_argument('--ppts-local-columns', metavar='A,B,C', help=f"колонки ID, Продукт, Вендор локального ППТС (по умолчанию \"{DEFAULT_CONFIG['ppts_local_columns']}\")")
+    settings.add_argument('--ppts-general-columns', metavar='A,B,C', help=f"колонки ID, Продукт, Вендор общего ППТС (по умолчанию \"{DEFAULT_CONFIG['ppts_general_columns']}\")")
+    for key in INT_CONFIG_KEYS: settings.add_argument('--' + key.replace('_', '-'), type=int, metavar='N', help=f"по умолчанию {DEFAULT_CONFIG[key]}")
+    settings.add_argument('-w', '--workers', dest='worker_count', type=int, metavar='N', help="число процессов анализа (0 = все ядра)")
+    settings.add_argument('--engine', dest='match_engine', choices=MATCH_ENGINES, help="движок сравнения слов")
+    settings.add_argument('-k', '--max-matches', dest='max_matches_per_vuln', type=int, metavar='K', help="не более K лучших совпадений ППТС на уязвимость (0 = все)")
+    settings.add_argument('--ppts-cache-dir', metavar='DIR', help="каталог кэша разобранных ППТС (по умолчанию ~/.cache/status_gui)")
+    settings.add_argument('--no-ppts-cache', dest='use_ppts_cache', action='store_const', const='0', help="не использовать кэш ППТС")
+    settings.add_argument('--incremental', action='store_const', const='1', help="повторно использовать результаты прошлых запусков с теми же настройками (пересчитываются только продукты, затронутые изменениями ППТС)")
+    settings.add_argument('--profile-sheet', action='store_const', const='1', help="добавить в отчет лист «Профилирование» (время этапов и счетчики)")
+    parser.add_argument('--check', action='store_true', help="только проверить входные данные и настройки, без анализа")
+    return parser
+
+def build_config_data(args):
+    config_data = dict(DEFAULT_CONFIG); config_data.update({'known_status': '', 'known_da': '', 'known_linux': ''})
+    if args.status_config_file:
+        status_config = read_status_config(args.status_config_file)
+        for key, value in status_config['settings'].items():
+            if key in STATUS_CONFIG_SETTINGS: config_data[STATUS_CONFIG_SETTINGS[key]] = value
+        config_data.update({k: status_config[k] for k in ['known_status', 'known_da', 'known_linux']})
+    for key, value in vars(args).items():
+        if value is not None and key not in ('check', 'status_config_file'): config_data[key] = str(value)
+    return config_data
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try: config_data = build_config_data(args)
+    except (OSError, configparser.Error) as e:
+        print(f"Не удалось загрузить или разобрать файл конфигурации: {e}", file=sys.stderr); return 2
+    errors = validate_config_data(config_data)
+    if errors:
+        for error in errors: print(f"Ошибка: {error}", file=sys.stderr)
+        return 2
+    if args.check: print("Конфигурация корректна."); return 0
+    return 0 if analyze_data(ConsoleProgress(), config_data) else 1
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,869 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+import re
+import time
+import contextlib
+import math
+import bisect
+import heapq
+import functools
+import importlib
+import hashlib
+import pickle
+import sqlite3
+from collections import Counter, OrderedDict, deque
+import configparser
+import sys
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+class _LazyModule:
+    def __init__(self, name): self._name = name; self._module = None
+    def __getattr__(self, attr):
+        if self._module is None: self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+pd = _LazyModule('pandas')
+np = _LazyModule('numpy')
+fuzz = _LazyModule('fuzzywuzzy.fuzz')
+openpyxl = _LazyModule('openpyxl')
+
+MIN_WORD_LENGTH = 3
+MIN_RATIO_SCORE = 60
+RATIO_THRESHOLD_2 = 85
+MIN_OUTPUT_INDEX = 1
+WORD_MATCH_COUNT_THRESHOLD = 60
+MIN_WORD_COUNT_FOR_OUTPUT = 1
+MATCH_ENGINE = 'python'
+MAX_MATCHES_PER_VULN = 0
+MATCH_ENGINES = ('python', 'numpy')
+MATCH_STATS = Counter()
+WORD_PAIR_CACHE_SIZE = 500000
+PRODUCT_MEMO_SIZE = 50000
+PRODUCT_MEMO_MAX_MATCHES = 50000
+ANALYSIS_CHUNK_SIZE = 100
+PPTS_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'status_gui')
+PPTS_CACHE_VERSION = 1
+PPTS_CACHE_KEEP = 6
+RESULTS_STORE_VERSION = 2
+PROFILE_COUNTERS = [('vuln_rows', 'Строк уязвимостей'), ('fuzz_comparisons', 'Сравнений fuzz.ratio'), ('ppts_rows_scanned', 'Пар (уязвимость × строка ППТС) оценено'), ('ppts_rows_pruned', 'Пар отсечено блокировкой'), ('matches_emitted', 'Совпадений выведено')]
+STATUS_CONFIG_SETTINGS = {'workers': 'worker_count', 'engine': 'match_engine', 'ppts_cache': 'use_ppts_cache', 'ppts_cache_dir': 'ppts_cache_dir', 'max_matches': 'max_matches_per_vuln', 'incremental': 'incremental', 'profile_sheet': 'profile_sheet'}
+VULN_COLUMNS = ['№', 'CVE', 'CVSS', 'Продукт', 'Источник']
+MAIN_COLUMNS = ['№', 'Дата обработки', 'Ответственный', 'Публикация', 'Статус', 'ID ППТС', 'CVE', 'CVSS', 'Продукт', 'Источник']
+PANDAS_NA_STRINGS = frozenset(['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'])
+INT_CONFIG_KEYS = ['min_word_length', 'min_ratio_score', 'ratio_threshold_2', 'min_output_index', 'word_match_count_threshold', 'min_word_count_for_output']
+
+def get_prefix_match_threshold(word):
+    length = len(word)
+    if length < 5: return 1.0
+    if length < 10: return 0.9
+    return 0.8
+
+def get_required_prefix_length(word):
+    length = len(word); required_ratio = get_prefix_match_threshold(word)
+    prefix_length = min(length, max(1, math.ceil(required_ratio * length)))
+    while prefix_length > 1 and (prefix_length - 1) / length >= required_ratio: prefix_length -= 1
+    while prefix_length < length and prefix_length / length < required_ratio: prefix_length += 1
+    return prefix_length
+
+def calculate_prefix_match_ratio(s1, s2):
+    min_len = min(len(s1), len(s2))
+    if min_len == 0: return 0.0
+    match_count = 0
+    for i in range(min_len):
+        if s1[i] == s2[i]:
+            match_count += 1
+        else:
+            break
+    return match_count / len(s1)
+
+def get_status_from_config(product_string, da_mapping, linux_mapping, status_mapping):
+    clean_product = product_string.lower()
+    vendor, product = split_vendor_product(product_string)
+    vuln_vendor_lower, vuln_product_lower = vendor.lower(), product.lower()
+    search_parts = [clean_product, vuln_vendor_lower, vuln_product_lower]
+    def check_config_mapping(mapping):
+        for key_phrase, value in mapping.items():
+            if key_phrase and any(key_phrase in part for part in search_parts if part):
+                return key_phrase, value
+        return None, None
+    key_s, val_s = check_config_mapping(status_mapping)
+    if key_s:
+        status, product_id = val_s; return status, product_id, "KnownSTATUS Config", key_s
+    key_d, product_id = check_config_mapping(da_mapping)
+    if key_d: return "ДА", product_id, "KnownDA Config", key_d
+    key_l, product_id = check_config_mapping(linux_mapping)
+    if key_l: return "ЛИНУКС", product_id, "KnownLINUX Config", key_l
+    return "", "", "", ""
+
+class KeyPhraseMatcher:
+    def __init__(self, da_mapping, linux_mapping, status_mapping):
+        self.verdicts = []; self.goto = [{}]; self.fail = [0]; self.best = [None]
+        rules = [(key, value[0], value[1], "KnownSTATUS Config") for key, value in status_mapping.items()]
+        rules += [(key, "ДА", value, "KnownDA Config") for key, value in da_mapping.items()] + [(key, "ЛИНУКС", value, "KnownLINUX Config") for key, value in linux_mapping.items()]
+        for key_phrase, status, product_id, source_type in rules:
+            if not key_phrase: continue
+            node = 0
+            for ch in key_phrase:
+                next_node = self.goto[node].get(ch)
+                if next_node is None:
+                    next_node = len(self.goto); self.goto[node][ch] = next_node; self.goto.append({}); self.fail.append(0); self.best.append(None)
+                node = next_node
+            if self.best[node] is None: self.best[node] = len(self.verdicts)
+            self.verdicts.append((status, product_id, source_type, key_phrase))
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for ch, child in self.goto[node].items():
+                fail_node = self.fail[node]
+                while fail_node and ch not in self.goto[fail_node]: fail_node = self.fail[fail_node]
+                self.fail[child] = self.goto[fail_node].get(ch, 0)
+                inherited = self.best[self.fail[child]]
+                if inherited is not None and (self.best[child] is None or inherited < self.best[child]): self.best[child] = inherited
+                queue.append(child)
+    def get_status(self, product_string):
+        vendor, product = split_vendor_product(product_string)
+        goto, fail, best = self.goto, self.fail, self.best; found = None
+        for part in (product_string.lower(), vendor.lower(), product.lower()):
+            node = 0
+            for ch in part:
+                while node and ch not in goto[node]: node = fail[node]
+                node = goto[node].get(ch, 0)
+                rank = best[node]
+                if rank is not None and (found is None or rank < found):
+                    found = rank
+                    if found == 0: return self.verdicts[0]
+        return self.verdicts[found] if found is not None else ("", "", "", "")
+
+def load_and_preprocess_ppts_data(local_path, general_path, cols_l, cols_g):
+    try:
+        df_local = pd.read_excel(local_path, header=None, usecols=cols_l, dtype=str)
+        df_local.columns = ['ID_PPTS', 'Product_PPTS', 'Vendor_PPTS']; df_local['Source_PPTS'] = 'Local PPTS'
+        df_general = pd.read_excel(general_path, header=None, usecols=cols_g, dtype=str)
+        df_general.columns = ['ID_PPTS', 'Product_PPTS', 'Vendor_PPTS']; df_general['Source_PPTS'] = 'General PPTS'
+    except ValueError as e: raise Exception(f"Ошибка при чтении столбцов ППТС: {e}")
+    except FileNotFoundError as e: raise FileNotFoundError(f"Файл ППТС не найден: {e.filename}")
+    df_ppts = pd.concat([df_local, df_general], ignore_index=True); df_ppts = df_ppts.fillna('')
+    return df_ppts
+
+def normalize_string_words(s, min_word_length=None):
+    global MIN_WORD_LENGTH
+    if not s: return set()
+    min_len = MIN_WORD_LENGTH if min_word_length is None else min_word_length
+    s = re.sub(r'\d+', '', s); s = re.sub(r'[^\w\s]', ' ', s.lower())
+    return {w for w in s.split() if len(w) >= min_len}
+
+def split_vendor_product(product_string):
+    if ',' in product_string:
+        parts = product_string.split(',', 1); return parts[0].strip(), parts[1].strip()
+    if '-' in product_string:
+        parts = product_string.split('-', 1); return parts[0].strip(), parts[1].strip()
+    return '', product_string.strip()
+
+class PptsIndex:
+    def __init__(self, ppts_df, min_word_length=None):
+        global MIN_WORD_LENGTH
+        self.min_word_length = MIN_WORD_LENGTH if min_word_length is None else min_word_length
+        vendors = [str(v) for v in ppts_df['Vendor_PPTS'].tolist()]; products = [str(p) for p in ppts_df['Product_PPTS'].tolist()]
+        self.ids = ppts_df['ID_PPTS'].tolist(); self.sources = ppts_df['Source_PPTS'].tolist()
+        self.display_names = [f"{v} - {p}".strip(' - ') for v, p in zip(vendors, products)]
+        self.has_vendor = [bool(v) for v in vendors]; self.has_product = [bool(p) for p in products]
+        word_sets = {}
+        def tokenize(value):
+            words = word_sets.get(value)
+            if words is None:
+                words = frozenset(sys.intern(w) for w in normalize_string_words(value, self.min_word_length)); word_sets[value] = words
+            return words
+        self.vendor_words = [tokenize(v) for v in vendors]; self.product_words = [tokenize(p) for p in products]
+        postings = {}
+        for i, (vendor_words, product_words) in enumerate(zip(self.vendor_words, self.product_words)):
+            for word in vendor_words | product_words: postings.setdefault(word, []).append(i)
+        self.vocabulary = sorted(postings); self.postings = [postings[w] for w in self.vocabulary]
+        self._vectorized_scorer = None
+    def __len__(self): return len(self.ids)
+    def row_signatures(self):
+        return list(zip(self.ids, self.sources, self.display_names, self.vendor_words, self.product_words, self.has_vendor, self.has_product))
+    def vectorized_scorer(self):
+        if self._vectorized_scorer is None: self._vectorized_scorer = VectorizedScorer(self)
+        return self._vectorized_scorer
+    def prefix_range(self, w_src):
+        vocabulary = self.vocabulary; prefix = w_src[:get_required_prefix_length(w_src)]; start = end = bisect.bisect_left(vocabulary, prefix)
+        while end < len(vocabulary) and vocabulary[end].startswith(prefix): end += 1
+        return start, end
+    def candidate_rows(self, src_words):
+        rows = set()
+        for w_src in src_words:
+            start, end = self.prefix_range(w_src)
+            for pos in range(start, end): rows.update(self.postings[pos])
+        return sorted(rows)
+    def prefix_hit_counts(self, src_vendor_words, src_product_words):
+        vendor_counts, product_counts, combined_counts = Counter(), Counter(), Counter()
+        for w_src in src_vendor_words | src_product_words:
+            start, end = self.prefix_range(w_src); hit_words = frozenset(self.vocabulary[start:end]); rows = set()
+            for pos in range(start, end): rows.update(self.postings[pos])
+            for i in rows:
+                combined_counts[i] += 1
+                if w_src in src_vendor_words and not hit_words.isdisjoint(self.vendor_words[i]): vendor_counts[i] += 1
+                if w_src in src_product_words and not hit_words.isdisjoint(self.product_words[i]): product_counts[i] += 1
+        return vendor_counts, product_counts, combined_counts
+
+def _build_csr(groups):
+    indptr = np.zeros(len(groups) + 1, dtype=np.int64); np.cumsum([len(g) for g in groups], out=indptr[1:])
+    ids = np.fromiter((x for g in groups for x in g), dtype=np.int64, count=int(indptr[-1]))
+    return indptr, ids
+
+def _gather_csr(indptr, ids, rows):
+    starts = indptr[rows]; lengths = indptr[rows + 1] - starts
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(int(lengths.sum()), dtype=np.int64)
+    return ids[offsets], lengths
+
+def _popcount64(x):
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((x * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+def _match_index_array(vendor_scores, product_scores):
+    global MIN_RATIO_SCORE, RATIO_THRESHOLD_2
+    n1, n2 = MIN_RATIO_SCORE, RATIO_THRESHOLD_2
+    v1, p1 = vendor_scores >= n1, product_scores >= n1
+    v2, p2 = vendor_scores >= n2, product_scores >= n2
+    return np.select([v2 & p2, v1 & p1, v2 | p2, v1 | p1], [4, 3, 2, 1], 0)
+
+class VectorizedScorer:
+    def __init__(self, ppts_index):
+        vocabulary = ppts_index.vocabulary; word_ids = {w: i for i, w in enumerate(vocabulary)}
+        self.vocabulary = vocabulary; self.alphabet = {c: i + 1 for i, c in enumerate(sorted({c for w in vocabulary for c in w}))}
+        self.lengths = np.array([len(w) for w in vocabulary], dtype=np.int64)
+        self.codes = np.zeros((len(vocabulary), int(self.lengths.max()) if len(vocabulary) else 1), dtype=np.int32)
+        for i, w in enumerate(vocabulary): self.codes[i, :len(w)] = [self.alphabet[c] for c in w]
+        self.vendor = _build_csr([[word_ids[w] for w in words] for words in ppts_index.vendor_words]); self.product = _build_csr([[word_ids[w] for w in words] for words in ppts_index.product_words])
+        self.combined = _build_csr([[word_ids[w] for w in v | p] for v, p in zip(ppts_index.vendor_words, ppts_index.product_words)]); self.postings = _build_csr(ppts_index.postings)
+        self.has_vendor = np.array(ppts_index.has_vendor, dtype=bool); self.has_product = np.array(ppts_index.has_product, dtype=bool)
+    def word_scores(self, src_words):
+        global WORD_MATCH_COUNT_THRESHOLD
+        scores = np.zeros((len(src_words), len(self.vocabulary)), dtype=np.int16)
+        if not src_words or not self.vocabulary: return scores
+        width = min(self.codes.shape[1], max(len(w) for w in src_words))
+        src_codes = np.full((len(src_words), width), -1, dtype=np.int32)
+        for i, w in enumerate(src_words): src_codes[i, :min(len(w), width)] = [self.alphabet.get(c, -1) for c in w[:width]]
+        src_lengths = np.array([len(w) for w in src_words], dtype=np.int64)
+        equal = src_codes[:, None, :] == self.codes[None, :, :width]
+        prefix_lengths = np.where(equal.all(axis=2), width, equal.argmin(axis=2))
+        required = np.array([get_prefix_match_threshold(w) for w in src_words])
+        src_idx, vocab_idx = np.nonzero(prefix_lengths / src_lengths[:, None] >= required[:, None])
+        if not len(src_idx): return scores
+        pattern_masks = np.zeros((len(src_words), len(self.alphabet) + 1), dtype=np.uint64); low_bits = np.zeros(len(src_words), dtype=np.uint64)
+        for i, w in enumerate(src_words):
+            for bit, c in enumerate(w[:64]):
+                code = self.alphabet.get(c)
+                if code: pattern_masks[i, code] |= np.uint64(1 << bit)
+            low_bits[i] = np.uint64((1 << min(len(w), 64)) - 1)
+        text = self.codes[vocab_idx]; masks = pattern_masks[src_idx]; rows = np.arange(len(src_idx))
+        v = np.full(len(src_idx), np.uint64(0xFFFFFFFFFFFFFFFF))
+        for j in range(int(self.lengths[vocab_idx].max())):
+            u = v & masks[rows, text[:, j]]; v = (v + u) | (v - u)
+        m = src_lengths[src_idx]; lcs = np.minimum(m, 64) - _popcount64(v & low_bits[src_idx])
+        ratio_bound = np.where(m > 64, 100.0, np.ceil(100 * (2.0 * lcs / (m + self.lengths[vocab_idx]))))
+        for si, vi in zip(*(idx[ratio_bound >= WORD_MATCH_COUNT_THRESHOLD] for idx in (src_idx, vocab_idx))):
+            scores[si, vi] = get_word_pair_score(src_words[si], self.vocabulary[vi])
+        return scores
+    def rows_for_words(self, vocab_ids):
+        rows, _ = _gather_csr(self.postings[0], self.postings[1], vocab_ids)
+        return np.unique(rows)
+    def reduce(self, word_scores, csr, rows):
+        global WORD_MATCH_COUNT_THRESHOLD
+        scores = np.zeros(len(rows), dtype=np.int64); counts = np.zeros(len(rows), dtype=np.int64)
+        if not len(word_scores) or not len(rows): return scores, counts
+        ids, lengths = _gather_csr(csr[0], csr[1], rows); nonempty = lengths > 0
+        if not nonempty.any(): return scores, counts
+        best = np.maximum.reduceat(word_scores[:, ids], (np.cumsum(lengths) - lengths)[nonempty], axis=1)
+        scores[nonempty] = best.max(axis=0); counts[nonempty] = (best >= WORD_MATCH_COUNT_THRESHOLD).sum(axis=0)
+        return scores, counts
+
+@functools.lru_cache(maxsize=WORD_PAIR_CACHE_SIZE)
+def get_word_pair_score(w_src, w_ppts):
+    global WORD_MATCH_COUNT_THRESHOLD, MATCH_STATS
+    if calculate_prefix_match_ratio(w_src, w_ppts) < get_prefix_match_threshold(w_src): return 0
+    MATCH_STATS['fuzz_comparisons'] += 1; ratio = fuzz.ratio(w_src, w_ppts)
+    return ratio if ratio >= WORD_MATCH_COUNT_THRESHOLD else 0
+
+def get_word_match_stats(words_src, words_ppts):
+    global WORD_MATCH_COUNT_THRESHOLD
+    if not words_src or not words_ppts: return 0.0, 0
+    max_score = 0.0
+    good_matches_count = 0
+    for w_src in words_src:
+        best_ratio_for_word = 0
+        for w_ppts in words_ppts:
+            ratio = get_word_pair_score(w_src, w_ppts)
+            if ratio > best_ratio_for_word:
+                best_ratio_for_word = ratio
+        if best_ratio_for_word > max_score:
+            max_score = best_ratio_for_word
+        if best_ratio_for_word >= WORD_MATCH_COUNT_THRESHOLD:
+            good_matches_count += 1
+    return max_score, good_matches_count
+
+def get_new_match_index(vendor_score, product_score):
+    global MIN_RATIO_SCORE, RATIO_THRESHOLD_2
+    n1, n2 = MIN_RATIO_SCORE, RATIO_THRESHOLD_2
+    v1, p1 = vendor_score >= n1, product_score >= n1
+    v2, p2 = vendor_score >= n2, product_score >= n2
+    if v2 and p2: return 4
+    if v1 and p1: return 3
+    if v2 or p2: return 2
+    if v1 or p1: return 1
+    return 0
+
+def can_prune_candidates():
+    global MIN_OUTPUT_INDEX
+    return get_new_match_index(0.0, 0) < MIN_OUTPUT_INDEX
+
+def get_match_upper_bound(src_vendor_words, src_product_words, hit_counts, ppts_index, i):
+    global WORD_MATCH_COUNT_THRESHOLD
+    ppts_vendor_words, ppts_product_words = ppts_index.vendor_words[i], ppts_index.product_words[i]
+    vendor_hits, product_hits, combined_hits = (counts.get(i, 0) for counts in hit_counts)
+    index_bound = get_new_match_index(100 if vendor_hits else 0, 100 if product_hits else 0)
+    if WORD_MATCH_COUNT_THRESHOLD <= 0: vendor_hits, product_hits = (len(src_vendor_words) if ppts_vendor_words else 0), (len(src_product_words) if ppts_product_words else 0)
+    count_bound = vendor_hits + product_hits
+    if (not ppts_index.has_vendor[i] and src_vendor_words) or (not ppts_index.has_product[i] and src_product_words):
+        if WORD_MATCH_COUNT_THRESHOLD <= 0: combined_hits = len(src_vendor_words | src_product_words) if ppts_vendor_words or ppts_product_words else 0
+        index_bound = max(index_bound, get_new_match_index(100 if combined_hits else 0, 0)); count_bound = max(count_bound, combined_hits)
+    return index_bound, count_bound
+
+def push_top_match(heap, limit, key, match):
+    if len(heap) < limit: heapq.heappush(heap, (key, match))
+    elif key > heap[0][0]: heapq.heapreplace(heap, (key, match))
+
+def find_new_strict_matches(vuln_product_str, ppts_index):
+    global MIN_OUTPUT_INDEX, MIN_WORD_COUNT_FOR_OUTPUT, MATCH_STATS, MAX_MATCHES_PER_VULN, WORD_MATCH_COUNT_THRESHOLD
+    if not isinstance(ppts_index, PptsIndex): ppts_index = PptsIndex(ppts_index)
+    if MATCH_ENGINE == 'numpy': return find_new_strict_matches_vectorized(vuln_product_str, ppts_index)
+    src_vendor, src_product = split_vendor_product(vuln_product_str)
+    src_vendor_words = normalize_string_words(src_vendor)
+    src_product_words = normalize_string_words(src_product)
+    src_combined_words = src_vendor_words.union(src_product_words)
+    matches = []
+    limit = MAX_MATCHES_PER_VULN if MAX_MATCHES_PER_VULN > 0 else 0; top_matches = []
+    hit_counts = ppts_index.prefix_hit_counts(src_vendor_words, src_product_words) if limit else None
+    if limit and WORD_MATCH_COUNT_THRESHOLD > 0 and (get_new_match_index(0.0, 0) < MIN_OUTPUT_INDEX or MIN_WORD_COUNT_FOR_OUTPUT > 0): rows = sorted(hit_counts[2])
+    else: rows = ppts_index.candidate_rows(src_combined_words) if can_prune_candidates() else range(len(ppts_index))
+    MATCH_STATS['ppts_rows_total'] += len(ppts_index); MATCH_STATS['ppts_rows_pruned'] += len(ppts_index) - len(rows)
+    if limit:
+        bounds = {i: get_match_upper_bound(src_vendor_words, src_product_words, hit_counts, ppts_index, i) for i in rows}
+        rows = sorted(rows, key=lambda i: (-bounds[i][0], -bounds[i][1], i))
+    for scanned, i in enumerate(rows):
+        if limit and len(top_matches) >= limit and (*bounds[i], 100, -i) < top_matches[0][0]:
+            MATCH_STATS['top_k_rows_skipped'] += len(rows) - scanned; break
+        ppts_vendor_words, ppts_product_words = ppts_index.vendor_words[i], ppts_index.product_words[i]
+        vendor_score, vendor_word_count = get_word_match_stats(src_vendor_words, ppts_vendor_words)
+        product_score, product_word_count = get_word_match_stats(src_product_words, ppts_product_words)
+        match_index = get_new_match_index(vendor_score, product_score)
+        total_word_count = vendor_word_count + product_word_count
+        if match_index == 0:
+            if (not ppts_index.has_vendor[i] and src_vendor_words) or (not ppts_index.has_product[i] and src_product_words):
+                ppts_combined_words = ppts_vendor_words.union(ppts_product_words)
+                combined_score, combined_word_count = get_word_match_stats(src_combined_words, ppts_combined_words)
+                match_index = get_new_match_index(combined_score, 0)
+                vendor_score, product_score = combined_score, 0
+                total_word_count = combined_word_count
+        if match_index >= MIN_OUTPUT_INDEX and total_word_count >= MIN_WORD_COUNT_FOR_OUTPUT:
+            sort_score = max(vendor_score, product_score)
+            match = {'display_name': ppts_index.display_names[i], 'index': match_index, 'vendor_score': vendor_score, 'product_score': product_score, 'sort_score': sort_score, 'id': ppts_index.ids[i], 'source': ppts_index.sources[i], 'matched_word_count': total_word_count}
+            if limit: push_top_match(top_matches, limit, (match_index, total_word_count, sort_score, -i), match)
+            else: matches.append(match)
+    if limit: return [match for _, match in sorted(top_matches, key=lambda entry: entry[0], reverse=True)]
+    matches.sort(key=lambda x: (x['index'], x['matched_word_count'], x['sort_score']), reverse=True)
+    return matches
+
+def find_new_strict_matches_vectorized(vuln_product_str, ppts_index):
+    global MIN_OUTPUT_INDEX, MIN_WORD_COUNT_FOR_OUTPUT, MATCH_STATS, MAX_MATCHES_PER_VULN, WORD_MATCH_COUNT_THRESHOLD
+    src_vendor, src_product = split_vendor_product(vuln_product_str)
+    src_vendor_words = normalize_string_words(src_vendor)
+    src_product_words = normalize_string_words(src_product)
+    src_words = sorted(src_vendor_words | src_product_words)
+    scorer = ppts_index.vectorized_scorer(); word_scores = scorer.word_scores(src_words)
+    rows = scorer.rows_for_words(np.flatnonzero(word_scores.any(axis=0))) if can_prune_candidates() else np.arange(len(ppts_index))
+    MATCH_STATS['ppts_rows_total'] += len(ppts_index); MATCH_STATS['ppts_rows_pruned'] += len(ppts_index) - len(rows)
+    vendor_sel = [i for i, w in enumerate(src_words) if w in src_vendor_words]; product_sel = [i for i, w in enumerate(src_words) if w in src_product_words]
+    vendor_scores, vendor_counts = scorer.reduce(word_scores[vendor_sel], scorer.vendor, rows)
+    product_scores, product_counts = scorer.reduce(word_scores[product_sel], scorer.product, rows)
+    match_index = _match_index_array(vendor_scores, product_scores); total_counts = vendor_counts + product_counts
+    fallback = (match_index == 0) & (((~scorer.has_vendor[rows]) & bool(src_vendor_words)) | ((~scorer.has_product[rows]) & bool(src_product_words)))
+    if fallback.any():
+        combined_scores, combined_counts = scorer.reduce(word_scores, scorer.combined, rows[fallback])
+        match_index[fallback] = _match_index_array(combined_scores, np.zeros_like(combined_scores)); vendor_scores[fallback] = combined_scores; product_scores[fallback] = 0; total_counts[fallback] = combined_counts
+    matches = []; selected = np.flatnonzero((match_index >= MIN_OUTPUT_INDEX) & (total_counts >= MIN_WORD_COUNT_FOR_OUTPUT))
+    if MAX_MATCHES_PER_VULN > 0 and len(selected) > MAX_MATCHES_PER_VULN:
+        order = np.lexsort((rows[selected], -np.maximum(vendor_scores[selected], product_scores[selected]), -total_counts[selected], -match_index[selected]))
+        selected = np.sort(selected[order[:MAX_MATCHES_PER_VULN]])
+    for pos in selected:
+        i = int(rows[pos]); vendor_score = int(vendor_scores[pos]) or 0.0; product_score = int(product_scores[pos]) or (0 if fallback[pos] else 0.0)
+        sort_score = max(vendor_score, product_score)
+        matches.append({'display_name': ppts_index.display_names[i], 'index': int(match_index[pos]), 'vendor_score': vendor_score, 'product_score': product_score, 'sort_score': sort_score, 'id': ppts_index.ids[i], 'source': ppts_index.sources[i], 'matched_word_count': int(total_counts[pos])})
+    matches.sort(key=lambda x: (x['index'], x['matched_word_count'], x['sort_score']), reverse=True)
+    return matches
+
+def get_file_fingerprint(path):
+    stat = os.stat(path); digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''): digest.update(block)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+
+def _read_cache_entry(cache_path):
+    try:
+        with open(cache_path, 'rb') as f: return pickle.load(f)
+    except FileNotFoundError: return None
+    except Exception as e:
+        print(f"Кэш ППТС: файл {os.path.basename(cache_path)} не читается ({e}), будет перестроен"); return None
+
+def _touch_cache_entry(cache_path):
+    try: os.utime(cache_path)
+    except OSError: pass
+
+def _prune_cache_entries(cache_dir, prefix, suffixes):
+    entries = sorted((os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.startswith(prefix) and name.endswith(suffixes)), key=os.path.getmtime, reverse=True)
+    for old_path in entries[PPTS_CACHE_KEEP:]: os.remove(old_path)
+
+def _write_cache_entry(cache_path, value, prefix):
+    cache_dir = os.path.dirname(cache_path); tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_path, 'wb') as f: pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path); _prune_cache_entries(cache_dir, prefix, '.pickle')
+    except OSError as e:
+        print(f"Кэш ППТС: не удалось сохранить {os.path.basename(cache_path)}: {e}")
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+
+def load_ppts_index(local_path, general_path, cols_l, cols_g, cache_dir=None):
+    global MIN_WORD_LENGTH
+    if not cache_dir:
+        print("Чтение ППТС (кэш отключен)..."); return PptsIndex(load_and_preprocess_ppts_data(local_path, general_path, cols_l, cols_g))
+    try: fingerprints = [get_file_fingerprint(local_path), get_file_fingerprint(general_path)]
+    except FileNotFoundError as e: raise FileNotFoundError(f"Файл ППТС не найден: {e.filename}")
+    table_key = hashlib.blake2b(repr((PPTS_CACHE_VERSION, fingerprints, list(cols_l), list(cols_g))).encode('utf-8'), digest_size=16).hexdigest()
+    index_path = os.path.join(cache_dir, f"ppts_index_{table_key}_{MIN_WORD_LENGTH}.pickle"); table_path = os.path.join(cache_dir, f"ppts_table_{table_key}.pickle")
+    ppts_index = _read_cache_entry(index_path)
+    if ppts_index is not None:
+        _touch_cache_entry(index_path); print(f"Кэш ППТС: попадание, индекс загружен из {index_path}"); return ppts_index
+    df_ppts = _read_cache_entry(table_path)
+    if df_ppts is not None:
+        _touch_cache_entry(table_path); print("Кэш ППТС: таблица загружена из кэша, перестроение индекса (изменилась мин. длина слова)...")
+    else:
+        print("Кэш ППТС: промах (файлы или колонки изменились), чтение ППТС и перестроение...")
+        df_ppts = load_and_preprocess_ppts_data(local_path, general_path, cols_l, cols_g); _write_cache_entry(table_path, df_ppts, 'ppts_table_')
+    ppts_index = PptsIndex(df_ppts); _write_cache_entry(index_path, ppts_index, 'ppts_index_')
+    return ppts_index
+
+def parse_flag(value): return str(value).strip().lower() not in ('', '0', 'false', 'no', 'off', 'нет')
+
+def get_changed_ppts_words(old_signatures, new_signatures):
+    old_counts, new_counts = Counter(old_signatures), Counter(new_signatures)
+    def common_rows(signatures, remaining):
+        rows = []
+        for signature in signatures:
+            if remaining[signature] > 0: rows.append(signature); remaining[signature] -= 1
+        return rows
+    if common_rows(old_signatures, old_counts & new_counts) != common_rows(new_signatures, old_counts & new_counts): return None
+    changed_words = set()
+    for signature in (old_counts - new_counts) + (new_counts - old_counts): changed_words.update(signature[3] | signature[4])
+    return sorted(changed_words)
+
+def product_uses_words(product_string, sorted_words):
+    src_vendor, src_product = split_vendor_product(product_string)
+    for w_src in normalize_string_words(src_vendor) | normalize_string_words(src_product):
+        prefix = w_src[:get_required_prefix_length(w_src)]; pos = bisect.bisect_left(sorted_words, prefix)
+        if pos < len(sorted_words) and sorted_words[pos].startswith(prefix): return True
+    return False
+
+class ResultsStore:
+    def __init__(self, path, ppts_index):
+        self.path = path; self.tmp_path = f"{path}.{os.getpid()}.tmp"; self.row_signatures = ppts_index.row_signatures(); self.previous = None; self.current = None; self.changed_words = None
+        self._open_previous()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(self.tmp_path): os.remove(self.tmp_path)
+            self.current = sqlite3.connect(self.tmp_path); self.current.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value BLOB)"); self.current.execute("CREATE TABLE results (product TEXT PRIMARY KEY, matches BLOB)")
+        except (OSError, sqlite3.Error) as e:
+            print(f"Инкрементальный режим: не удалось создать файл результатов ({e}), результаты этого запуска не сохранятся"); self.current = None
+    def _open_previous(self):
+        if not os.path.exists(self.path): print("Инкрементальный режим: сохраненных результатов для этих настроек нет, полный расчет"); return
+        connection = None
+        try:
+            connection = sqlite3.connect(self.path); stored_signatures = pickle.loads(connection.execute("SELECT value FROM meta WHERE key = 'row_signatures'").fetchone()[0])
+        except Exception as e:
+            if connection is not None: connection.close()
+            print(f"Инкрементальный режим: файл {os.path.basename(self.path)} не читается ({e}), полный расчет"); return
+        if stored_signatures == self.row_signatures:
+            self.previous = connection; print(f"Инкрементальный режим: ППТС не изменились, доступно результатов: {connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]}"); return
+        changed_words = get_changed_ppts_words(stored_signatures, self.row_signatures) if can_prune_candidates() else None
+        if changed_words is None: connection.close(); print("Инкрементальный режим: ППТС изменились без возможности локального пересчета, полный расчет"); return
+        self.previous = connection; self.changed_words = changed_words; stored_count = 0; available_count = 0
+        for (product,) in connection.execute("SELECT product FROM results"):
+            stored_count += 1; available_count += not product_uses_words(product, changed_words)
+        print(f"Инкрементальный режим: в ППТС изменились слова ({len(changed_words)}), доступно результатов: {available_count} из {stored_count}")
+    def get(self, product_string):
+        key = product_string.lower()
+        if self.previous is None or (self.changed_words and product_uses_words(key, self.changed_words)): return None
+        row = self.previous.execute("SELECT matches FROM results WHERE product = ?", (key,)).fetchone()
+        return pickle.loads(row[0]) if row is not None else None
+    def put(self, product_string, matches):
+        if self.current is not None: self.current.execute("INSERT OR REPLACE INTO results VALUES (?, ?)", (product_string.lower(), pickle.dumps(matches, protocol=pickle.HIGHEST_PROTOCOL)))
+    def save(self):
+        if self.current is None: return
+        try:
+            self.current.execute("INSERT INTO meta VALUES ('row_signatures', ?)", (pickle.dumps(self.row_signatures, protocol=pickle.HIGHEST_PROTOCOL),)); self.current.commit(); self.current.close(); self.current = None
+            if self.previous is not None: self.previous.close(); self.previous = None
+            os.replace(self.tmp_path, self.path); _prune_cache_entries(os.path.dirname(self.path), 'results_', ('.pickle', '.sqlite'))
+        except (OSError, sqlite3.Error) as e:
+            print(f"Инкрементальный режим: не удалось сохранить {os.path.basename(self.path)}: {e}")
+        finally: self.close()
+    def close(self):
+        for connection in (self.previous, self.current):
+            if connection is not None: connection.close()
+        self.previous = self.current = None
+        if os.path.exists(self.tmp_path):
+            try: os.remove(self.tmp_path)
+            except OSError: pass
+
+def get_results_store_path(config_data, match_settings):
+    cache_dir = get_ppts_cache_dir(config_data)
+    if cache_dir is None: return None
+    settings = {k: v for k, v in match_settings.items() if k != 'match_engine'}
+    key = hashlib.blake2b(repr((RESULTS_STORE_VERSION, sorted(settings.items()), fuzz.SequenceMatcher.__module__)).encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, f"results_{key}.sqlite")
+
+def get_ppts_cache_dir(config_data):
+    if not parse_flag(config_data.get('use_ppts_cache', '1')): return None
+    return str(config_data.get('ppts_cache_dir') or '').strip() or PPTS_CACHE_DIR
+
+class LRUMemo:
+    def __init__(self, maxsize, max_weight=None):
+        self.maxsize = maxsize; self.max_weight = max_weight; self.weight = 0; self.data = OrderedDict(); self.hits = 0; self.misses = 0
+    def get(self, key):
+        entry = self.data.get(key)
+        if entry is None: self.misses += 1; return None
+        self.data.move_to_end(key); self.hits += 1; return entry[0]
+    def put(self, key, value, weight=1):
+        if self.max_weight is not None and weight > self.max_weight: return
+        old_entry = self.data.pop(key, None)
+        if old_entry is not None: self.weight -= old_entry[1]
+        self.data[key] = (value, weight); self.weight += weight
+        while len(self.data) > self.maxsize or (self.max_weight is not None and self.weight > self.max_weight): self.weight -= self.data.popitem(last=False)[1][1]
+
+def get_match_settings(config_data):
+    settings = {k: int(config_data[k]) for k in INT_CONFIG_KEYS}; settings['match_engine'] = str(config_data.get('match_engine', 'python')).strip().lower() or 'python'
+    if settings['match_engine'] not in MATCH_ENGINES: raise ValueError(f"Неизвестный движок сравнения: {settings['match_engine']}")
+    settings['max_matches_per_vuln'] = int(str(config_data.get('max_matches_per_vuln', '0')).strip() or 0)
+    if settings['max_matches_per_vuln'] < 0: raise ValueError(f"max_matches_per_vuln: ожидается число >= 0, получено {settings['max_matches_per_vuln']}")
+    return settings
+
+def apply_match_settings(settings):
+    global MIN_WORD_LENGTH, MIN_RATIO_SCORE, RATIO_THRESHOLD_2, MIN_OUTPUT_INDEX, WORD_MATCH_COUNT_THRESHOLD, MIN_WORD_COUNT_FOR_OUTPUT, MATCH_ENGINE, MAX_MATCHES_PER_VULN
+    MIN_WORD_LENGTH = settings['min_word_length']; MIN_RATIO_SCORE = settings['min_ratio_score']; RATIO_THRESHOLD_2 = settings['ratio_threshold_2']; MIN_OUTPUT_INDEX = settings['min_output_index']; WORD_MATCH_COUNT_THRESHOLD = settings['word_match_count_threshold']; MIN_WORD_COUNT_FOR_OUTPUT = settings['min_word_count_for_output']; MATCH_ENGINE = settings['match_engine']; MAX_MATCHES_PER_VULN = settings.get('max_matches_per_vuln', 0)
+    get_word_pair_score.cache_clear()
+
+def parse_rule_mappings(config_data):
+    known_da_mapping_raw = dict(re.findall(r"(.+?)\s*=\s*([^\n]+)", config_data['known_da'], re.IGNORECASE)); known_da_mapping = {k.lower().strip(): v.strip() for k, v in known_da_mapping_raw.items()}
+    known_status_mapping_raw = dict(re.findall(r"(.+?)\s*=\s*([^\n]+)", config_data['known_status'], re.IGNORECASE)); known_status_mapping = {}
+    for key, val in known_status_mapping_raw.items():
+        parts = [x.strip() for x in val.split(',')];
+        if len(parts) >= 2: known_status_mapping[key.lower()] = (parts[0].upper(), parts[1])
+    known_linux_mapping_raw = dict(re.findall(r"(.+?)\s*=\s*([^\n]+)", config_data['known_linux'], re.IGNORECASE)); known_linux_mapping = {k.lower().strip(): v.strip() for k, v in known_linux_mapping_raw.items()}
+    return known_da_mapping, known_linux_mapping, known_status_mapping
+
+def read_status_config(file_path):
+    config_parser = configparser.ConfigParser(allow_no_value=True)
+    with open(file_path, 'r', encoding='utf-8') as f: config_parser.read_string("[DEFAULT]\n" + f.read())
+    def find_section(section_name): return next((name for name in config_parser.sections() if name.upper() == section_name.upper()), None)
+    def get_section_text(section_name):
+        section = find_section(section_name)
+        if section: return "\n".join([f"{k} = {v}" if v is not None else k for k, v in config_parser.items(section)])
+        return ""
+    settings_section = find_section('Settings')
+    settings = {k: v.strip() for k, v in config_parser.items(settings_section) if v is not None} if settings_section else {}
+    return {'known_status': get_section_text('KnownSTATUS'), 'known_da': get_section_text('KnownDA'), 'known_linux': get_section_text('KnownLINUX'), 'settings': settings}
+
+def parse_columns(value): return [int(x.strip()) for x in value.split(',')]
+
+def validate_config_data(config_data):
+    errors = []
+    for key in ['file_vulnerabilities', 'file_ppts_local', 'file_ppts_general']:
+        if not config_data.get(key): errors.append(f"Не указан файл: {key}")
+        elif not os.path.isfile(config_data[key]): errors.append(f"Файл не найден: {config_data[key]}")
+    if not config_data.get('output_file_path'): errors.append("Не указан путь отчета: output_file_path")
+    elif not os.path.isdir(os.path.dirname(os.path.abspath(config_data['output_file_path']))): errors.append(f"Каталог отчета не существует: {os.path.dirname(config_data['output_file_path'])}")
+    for key in ['ppts_local_columns', 'ppts_general_columns']:
+        try:
+            if len(parse_columns(config_data[key])) != 3: errors.append(f"{key}: нужно указать ровно 3 колонки (ID, Продукт, Вендор)")
+        except (KeyError, ValueError): errors.append(f"{key}: ожидается список номеров колонок через запятую")
+    try: get_match_settings(config_data)
+    except KeyError as e: errors.append(f"Не задан параметр: {e.args[0]}")
+    except ValueError as e: errors.append(f"Некорректное значение параметра: {e}")
+    try: get_worker_count(config_data)
+    except ValueError: errors.append(f"worker_count: ожидается целое число, получено {config_data.get('worker_count')!r}")
+    return errors
+
+def get_worker_count(config_data):
+    worker_count = int(str(config_data.get('worker_count', '1')).strip() or 1)
+    return worker_count if worker_count > 0 else (os.cpu_count() or 1)
+
+def analyze_products(products, ppts_index, rule_matcher, product_memo):
+    global MATCH_STATS
+    MATCH_STATS.clear(); pair_cache_before = get_word_pair_score.cache_info(); memo_hits, memo_misses = product_memo.hits, product_memo.misses
+    results = []
+    for product_to_check in products:
+        product_result = product_memo.get(product_to_check.lower())
+        if product_result is None:
+            product_result = (rule_matcher.get_status(product_to_check), find_new_strict_matches(product_to_check, ppts_index)); product_memo.put(product_to_check.lower(), product_result, len(product_result[1]) + 1)
+        results.append(product_result)
+    pair_cache_after = get_word_pair_score.cache_info(); stats = Counter(MATCH_STATS)
+    stats.update({'pair_cache_hits': pair_cache_after.hits - pair_cache_before.hits, 'pair_cache_misses': pair_cache_after.misses - pair_cache_before.misses, 'product_memo_hits': product_memo.hits - memo_hits, 'product_memo_misses': product_memo.misses - memo_misses})
+    return results, stats
+
+_WORKER_STATE = {}
+
+def _init_analysis_worker(settings, ppts_index, rule_matcher):
+    apply_match_settings(settings)
+    _WORKER_STATE.update({'ppts_index': ppts_index, 'rule_matcher': rule_matcher, 'product_memo': LRUMemo(PRODUCT_MEMO_SIZE, PRODUCT_MEMO_MAX_MATCHES)})
+
+def _analyze_products_in_worker(products):
+    return analyze_products(products, _WORKER_STATE['ppts_index'], _WORKER_STATE['rule_matcher'], _WORKER_STATE['product_memo'])
+
+def _excel_cell_text(cell):
+    value = cell.value
+    if value is None or cell.data_type == 'e': return ''
+    if cell.data_type == 'n' and int(value) == value: value = int(value)
+    value = str(value)
+    return '' if value in PANDAS_NA_STRINGS else value
+
+def count_vulnerability_rows(path):
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[0]; sheet.reset_dimensions(); last_row = 1
+        for row_number, values in enumerate(sheet.iter_rows(values_only=True), start=1):
+            if any(value not in (None, '') for value in values): last_row = row_number
+    finally: workbook.close()
+    return last_row - 1
+
+def iter_vulnerability_rows(path):
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = workbook.worksheets[0]; sheet.reset_dimensions(); rows = sheet.iter_rows(); pending_empty = 0
+        next(rows, None)
+        for row_number, row in enumerate(rows, start=2):
+            width = len(row)
+            while width and row[width - 1].value in (None, ''): width -= 1
+            if not width: pending_empty += 1; continue
+            values = [_excel_cell_text(cell) for cell in row[:width]]
+            if len(values) > len(VULN_COLUMNS): raise ValueError(f"Файл уязвимостей: в строке {row_number} {len(values)} столбцов, ожидается {len(VULN_COLUMNS)} ({', '.join(VULN_COLUMNS)})")
+            for _ in range(pending_empty): yield ('',) * len(VULN_COLUMNS)
+            pending_empty = 0
+            yield tuple(values) + ('',) * (len(VULN_COLUMNS) - len(values))
+    finally: workbook.close()
+
+def release_flushed_rows(worksheet):
+    set_rows, row_sizes, previous_row = getattr(worksheet, 'set_rows', None), getattr(worksheet, 'row_sizes', None), getattr(worksheet, 'previous_row', None)
+    if not isinstance(set_rows, dict) or not isinstance(row_sizes, dict) or not isinstance(previous_row, int): return
+    for row in [row for row in set_rows if row < previous_row]: del set_rows[row]; row_sizes.pop(row, None)
+
+def iter_chunks(items, chunk_size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size: yield chunk; chunk = []
+    if chunk: yield chunk
+
+def iter_analyzed_chunks(chunks, ppts_index, rule_matcher, match_settings, worker_count, run_stats, results_store=None):
+    def split_chunk(chunk):
+        reused = {}
+        if results_store is not None:
+            for pos, row in enumerate(chunk):
+                matches = results_store.get(row[3])
+                if matches is not None: reused[pos] = (rule_matcher.get_status(row[3]), matches)
+        run_stats['rows_reused'] += len(reused); run_stats['rows_recomputed'] += len(chunk) - len(reused)
+        return reused, [row[3] for pos, row in enumerate(chunk) if pos not in reused]
+    def merge_chunk(chunk, reused, computed):
+        computed = iter(computed); chunk_results = [reused[pos] if pos in reused else next(computed) for pos in range(len(chunk))]
+        if results_store is not None:
+            for row, (_, matches) in zip(chunk, chunk_results): results_store.put(row[3], matches)
+        return chunk, chunk_results
+    if worker_count > 1:
+        with ProcessPoolExecutor(max_workers=worker_count, mp_context=multiprocessing.get_context('spawn'), initializer=_init_analysis_worker, initargs=(match_settings, ppts_index, rule_matcher)) as executor:
+            pending = deque()
+            def next_result():
+                chunk, reused, future = pending.popleft(); chunk_results, chunk_stats = future.result() if future is not None else ([], Counter()); run_stats.update(chunk_stats)
+                return merge_chunk(chunk, reused, chunk_results)
+            try:
+                for chunk in chunks:
+                    reused, products = split_chunk(chunk)
+                    pending.append((chunk, reused, executor.submit(_analyze_products_in_worker, products) if products else None))
+                    if len(pending) < worker_count * 2: continue
+                    yield next_result()
+                while pending: yield next_result()
+            finally:
+                for _, _, future in pending:
+                    if future is not None: future.cancel()
+    else:
+        product_memo = LRUMemo(PRODUCT_MEMO_SIZE, PRODUCT_MEMO_MAX_MATCHES)
+        for chunk in chunks:
+            reused, products = split_chunk(chunk)
+            chunk_results, chunk_stats = analyze_products(products, ppts_index, rule_matcher, product_memo); run_stats.update(chunk_stats)
+            yield merge_chunk(chunk, reused, chunk_results)
+
+class AnalysisCancelled(Exception): pass
+
+class StageProfiler:
+    def __init__(self): self.times = OrderedDict(); self.stack = []; self.counters = Counter()
+    @contextlib.contextmanager
+    def stage(self, name):
+        self.times.setdefault(name, 0.0); self.stack.append([name, time.perf_counter(), 0.0])
+        try: yield
+        finally:
+            name, start, nested = self.stack.pop(); elapsed = time.perf_counter() - start; self.times[name] += elapsed - nested
+            if self.stack: self.stack[-1][2] += elapsed
+    def iterate(self, iterable, name):
+        iterator = iter(iterable); done = object()
+        while True:
+            with self.stage(name): item = next(iterator, done)
+            if item is done: return
+            yield item
+    def snapshot(self):
+        times = OrderedDict(self.times); now = time.perf_counter(); child_elapsed = 0.0
+        for name, start, nested in reversed(self.stack):
+            elapsed = now - start; times[name] += elapsed - nested - child_elapsed; child_elapsed = elapsed
+        return times
+    def counter_values(self):
+        counters = Counter(self.counters); counters['ppts_rows_scanned'] = counters['ppts_rows_total'] - counters['ppts_rows_pruned'] - counters['top_k_rows_skipped']
+        return [(label, counters[key]) for key, label in PROFILE_COUNTERS]
+
+def print_profile(profiler):
+    print("Профилирование: " + "; ".join(f"{name} {seconds:.2f} с" for name, seconds in profiler.snapshot().items()))
+    print("Счетчики: " + "; ".join(f"{label} {value}" for label, value in profiler.counter_values()))
+
+def write_profile_sheet(workbook, header_format, profiler):
+    worksheet = workbook.add_worksheet('Профилирование'); worksheet.write_row(0, 0, ['Показатель', 'Значение'], header_format)
+    rows = [(f"Время: {name}, с", round(seconds, 3)) for name, seconds in profiler.snapshot().items()] + profiler.counter_values()
+    for row_num, row in enumerate(rows, start=1): worksheet.write_row(row_num, 0, row)
+    worksheet.set_column('A:A', 45); worksheet.set_column('B:B', 15)
+
+def format_progress(done, total, elapsed):
+    rate = done / elapsed if elapsed > 0 else 0.0
+    message = f"Обработано: {done}/{total if total is not None else '?'} строк, {rate:.0f} строк/с"
+    if total is not None and rate > 0 and done < total:
+        eta = int((total - done) / rate); message += f", осталось ~{eta // 3600}:{eta // 60 % 60:02d}:{eta % 60:02d}"
+    return message
+
+def _remove_partial_report(path):
+    if path and os.path.exists(path):
+        try: os.remove(path)
+        except OSError: pass
+
+def analyze_data(progress, config_data, profiler=None):
+    global MIN_RATIO_SCORE, RATIO_THRESHOLD_2, MIN_OUTPUT_INDEX, WORD_MATCH_COUNT_THRESHOLD, MIN_WORD_COUNT_FOR_OUTPUT
+    progress.update_status("Начало анализа..."); output_file_final = None; results_store = None; profiler = profiler if profiler is not None else StageProfiler()
+    try:
+        match_settings = get_match_settings(config_data); apply_match_settings(match_settings); worker_count = get_worker_count(config_data)
+        cols_l = parse_columns(config_data['ppts_local_columns']); cols_g = parse_columns(config_data['ppts_general_columns'])
+        with profiler.stage('Правила статусов'): rule_matcher = KeyPhraseMatcher(*parse_rule_mappings(config_data))
+        print("Чтение исходных файлов..."); total_rows = count_vulnerability_rows(config_data['file_vulnerabilities'])
+        with profiler.stage('Загрузка ППТС'): ppts_index = load_ppts_index(config_data['file_ppts_local'], config_data['file_ppts_general'], cols_l, cols_g, get_ppts_cache_dir(config_data))
+        if progress.is_cancelled(): raise AnalysisCancelled()
+        if parse_flag(config_data.get('incremental', '0')):
+            results_store_path = get_results_store_path(config_data, match_settings)
+            if results_store_path is None: print("Инкрементальный режим отключен: кэш на диске выключен (ppts_cache = 0)")
+            else:
+                with profiler.stage('Сохраненные результаты'): results_store = ResultsStore(results_store_path, ppts_index)
+        today_date = datetime.now().strftime('%d.%m.%Y')
+        worker_count = max(1, min(worker_count, -(-total_rows // ANALYSIS_CHUNK_SIZE)))
+        base_name, ext = os.path.splitext(config_data['output_file_path']); output_file_final = f"{base_name}_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}{ext if ext else '.xlsx'}"
+        print("Анализ уязвимостей с потоковой записью отчета..." if worker_count == 1 else f"Параллельный анализ с потоковой записью отчета: процессов {worker_count}")
+        run_stats = profiler.counters; vuln_counter = 1; row_num = 1; main_row_num = 1
+        with profiler.stage('Запись отчета'), pd.ExcelWriter(output_file_final, engine='xlsxwriter', engine_kwargs={'options': {'constant_memory': True}}) as writer:
+            pd.DataFrame(columns=MAIN_COLUMNS).to_excel(writer, sheet_name='Основная таблица', index=False); workbook = writer.book; worksheet_main = writer.sheets['Основная таблица']
+            header_format = workbook.add_format({'bold': True, 'text_wrap': True, 'valign': 'top', 'fg_color': '#D7E4BC', 'border': 1}); green_format = workbook.add_format({'bg_color': '#C6EFCE', 'border': 1}); gray_format = workbook.add_format({'bg_color': '#D3D3D3', 'border': 1}); wrap_format = workbook.add_format({'text_wrap': True, 'valign': 'top'}); match_index_bold = workbook.add_format({'bold': True}); match_wrap_format = workbook.add_format({'text_wrap': True, 'valign': 'top'})
+            worksheet_detailed = writer.book.add_worksheet('Детальный анализ')
+            detailed_headers = ['№', 'CVE', 'CVSS', 'Продукт', 'Источник', 'Статус из конфига', 'ID ППТС из конфига', 'ID ППТС (найденный)', 'Совпадение (Имя, Индекс)', 'Доп. Инфо ППТС']
+            worksheet_detailed.write_row('A1', detailed_headers, header_format)
+            chunks = profiler.iterate(iter_chunks(iter_vulnerability_rows(config_data['file_vulnerabilities']), ANALYSIS_CHUNK_SIZE), 'Чтение уязвимостей')
+            progress.update_progress(0, total_rows)
+            for chunk, chunk_results in profiler.iterate(iter_analyzed_chunks(chunks, ppts_index, rule_matcher, match_settings, worker_count, run_stats, results_store), 'Сопоставление'):
+                if progress.is_cancelled(): raise AnalysisCancelled()
+                for row, (config_result, new_matches_list) in zip(chunk, chunk_results):
+                    row = dict(zip(VULN_COLUMNS, row)); product_to_check = row['Продукт']
+                    config_status, config_id_ppts, config_source_type, config_key_phrase = config_result
+                    status, id_ppts, source_info = "", "", ""
+                    final_id_ppts = "-----------"; final_source_info = ""
+                    status_is_set = False
+                    is_da_config = config_status == "ДА"
+                    if is_da_config:
+                        status = "ДА"; final_id_ppts = config_id_ppts; final_source_info = config_source_type
+                        status_is_set = True
+                    if not status_is_set and config_status and config_status.startswith("УСЛОВНО"):
+                        status = "УСЛОВНО"; final_id_ppts = config_id_ppts; final_source_info = config_source_type
+                        status_is_set = True
+                    if not status_is_set and config_status == "ЛИНУКС":
+                        matches_conflicting = [m for m in new_matches_list if m['index'] >= 2]
+                        if not matches_conflicting:
+                            status = "ЛИНУКС"; final_id_ppts = config_id_ppts; final_source_info = config_source_type
+                        elif new_matches_list:
+                            status = ""; best_match = new_matches_list[0]; final_id_ppts = best_match['id']; final_source_info = best_match['source']
+                        status_is_set = True
+                    if not status_is_set:
+                        if not new_matches_list:
+                            status = "НЕТ"; final_id_ppts = "-----------"; final_source_info = ""
+                        else:
+                            status = ""; best_match = new_matches_list[0]; final_id_ppts = best_match['id']; final_source_info = best_match['source']
+                    id_ppts = final_id_ppts if status else ""; source_info = final_source_info if status else ""
+                    main_row = [row['№'], today_date, '', '', status, id_ppts, row['CVE'], row['CVSS'], product_to_check, row['Источник']]
+                    for col, value in enumerate(main_row): worksheet_main.write(main_row_num, col, value, None)
+                    main_row_num += 1
+                    detailed_status = config_status if config_status else ("НАЙДЕНО" if new_matches_list else "НЕТ")
+                    if config_status:
+                        status_for_detailed = f"{config_status} (Ключ: {config_key_phrase})"; id_for_detailed = f"{config_id_ppts} (Источник: {config_source_type})"
+                    else: status_for_detailed, id_for_detailed = '', ''
+                    current_format = None
+                    if detailed_status:
+                        if detailed_status in ["ДА", "НЕТ", "ЛИНУКС"] or detailed_status.startswith("УСЛОВНО"): current_format = green_format
+                        elif detailed_status == "НАЙДЕНО": current_format = gray_format
+                    base_cell_format = current_format if current_format else wrap_format
+                    base_data = [vuln_counter, row['CVE'], row['CVSS'], product_to_check, row['Источник'], status_for_detailed, id_for_detailed, '', '', '']
+                    worksheet_detailed.write_row(row_num, 0, base_data, base_cell_format); worksheet_detailed.set_row(row_num, None, base_cell_format); row_num += 1; vuln_counter += 1
+                    run_stats['vuln_rows'] += 1; run_stats['matches_emitted'] += len(new_matches_list)
+                    for match in new_matches_list:
+                        parts = [match_index_bold, f"({match['index']}) ", match_wrap_format, f"\"{match['display_name']}\""]
+                        extra_info = f"Вендор: {match['vendor_score']:.1f}%, Продукт: {match['product_score']:.1f}%, Слов > {WORD_MATCH_COUNT_THRESHOLD}%: {match['matched_word_count']}, Источник: {match['source']}"
+                        empty_cols = [''] * 7; match_row_format = wrap_format
+                        worksheet_detailed.write_row(row_num, 0, empty_cols, match_row_format)
+                        worksheet_detailed.write_string(row_num, 7, match['id'], match_row_format); worksheet_detailed.write_rich_string(row_num, 8, *parts, match_row_format); worksheet_detailed.write_string(row_num, 9, extra_info, match_row_format)
+                        worksheet_detailed.set_row(row_num, None, match_row_format); row_num += 1
+                release_flushed_rows(worksheet_detailed); progress.update_progress(vuln_counter - 1, total_rows)
+            total_pairs = run_stats['ppts_rows_total']; pruned_pairs = run_stats['ppts_rows_pruned']
+            print(f"Отбор кандидатов: отсечено {pruned_pairs} из {total_pairs} пар (уязвимость × строка ППТС), {100.0 * pruned_pairs / total_pairs if total_pairs else 0.0:.1f}%")
+            print(f"Кэш продуктов: попаданий {run_stats['product_memo_hits']}, промахов {run_stats['product_memo_misses']}; кэш пар слов: попаданий {run_stats['pair_cache_hits']}, промахов {run_stats['pair_cache_misses']}")
+            if results_store is not None: print(f"Инкрементальный режим: строк с повторно использованным результатом {run_stats['rows_reused']}, пересчитано {run_stats['rows_recomputed']}")
+            if MAX_MATCHES_PER_VULN > 0: print(f"Ограничение совпадений: не более {MAX_MATCHES_PER_VULN} на уязвимость, строк ППТС пропущено без оценки: {run_stats['top_k_rows_skipped']}")
+            print("\nЗавершение отчета Excel...")
+            index_explanation = {'Индекс': [0, 1, 2, 3, 4, ''], 'Пояснение': ['Нет совпадений (отсечено)', f'Лучшее слово совпало на >= {MIN_RATIO_SCORE}% ТОЛЬКО в Вендоре или ТОЛЬКО в Продукте', f'Лучшее слово совпало на >= {RATIO_THRESHOLD_2}% ТОЛЬКО в Вендоре или ТОЛЬКО в Продукте', f'Лучшие слова совпали на >= {MIN_RATIO_SCORE}% и в Вендоре, и в Продукте', f'Лучшие слова совпали на >= {RATIO_THRESHOLD_2}% и в Вендоре, и в Продукте', f'Примечание (Индекс вывода >= {MIN_OUTPUT_INDEX})'], 'Доп. Инфо': [f'Выводятся только совпадения с индексом >= {MIN_OUTPUT_INDEX} и кол-вом слов >= {MIN_WORD_COUNT_FOR_OUTPUT}', 'Сортировка по кол-ву слов > T%, затем по %.', 'Сортировка по кол-ву слов > T%, затем по %.', 'Сортировка по кол-ву слов > T%, затем по %.', 'Сортировка по кол-ву слов > T%, затем по %.', 'T - порог для подсчета слов (задается в GUI).']}
+            df_index = pd.DataFrame(index_explanation)
+            df_index.iloc[:0].to_excel(writer, sheet_name='Справка по индексам', index=False)
+            for i in range(len(df_index)): df_index.iloc[[i]].to_excel(writer, sheet_name='Справка по индексам', index=False, header=False, startrow=i + 1)
+            worksheet_main.set_column('A:J', 15); worksheet_main.set_column('I:I', 40)
+            worksheet_detailed.set_column('A:A', 5); worksheet_detailed.set_column('B:B', 20); worksheet_detailed.set_column('C:C', 10); worksheet_detailed.set_column('D:D', 35); worksheet_detailed.set_column('E:E', 25); worksheet_detailed.set_column('F:F', 20); worksheet_detailed.set_column('G:G', 40); worksheet_detailed.set_column('H:H', 20); worksheet_detailed.set_column('I:I', 40); worksheet_detailed.set_column('J:J', 60);
+            worksheet_index = writer.sheets['Справка по индексам']; worksheet_index.set_column('A:D', 40)
+            if parse_flag(config_data.get('profile_sheet', '0')): write_profile_sheet(workbook, header_format, profiler)
+        if results_store is not None:
+            with profiler.stage('Сохраненные результаты'): results_store.save()
+        print_profile(profiler)
+        print(f"\nОбработка завершена. Результаты сохранены в файл: {output_file_final}")
+        return output_file_final
+    except AnalysisCancelled:
+        print("\nАнализ отменен пользователем, незавершенный отчет удален."); _remove_partial_report(output_file_final); progress.update_status("Отменено")
+        return None
+    except Exception as e:
+        print(f"\nКРИТИЧЕСКАЯ ОШИБКА: {e}"); _remove_partial_report(output_file_final)
+        return None
+    finally:
+        if results_store is not None: results_store.close()
+